@@ -5,10 +5,42 @@ This bot demonstrates how to use Anthropic's Claude models without streaming.
 Claude excels at thoughtful, nuanced responses and complex reasoning.
 """
 
+import asyncio
 import os
+import re
 from bubbletea_chat import chatbot, Text, Markdown, LLM
 
 
+# Claude 3 models share a 200k token context window for prompt and reply
+CLAUDE_3_CONTEXT_TOKENS = 200_000
+TOO_LONG_REPLY = Text("📏 That message is too long for me to handle in one go. Please shorten it or split it into parts.")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of text, without loading a tokenizer
+    
+    English averages about four characters per token, so ASCII text is
+    counted at three per token. Other scripts such as CJK often take a
+    token per character or more, so each non-ASCII character counts as a
+    full token. This is a guard against clearly oversized prompts, not an
+    exact count; the API still has the final say.
+    """
+    if text.isascii():
+        return len(text) // 3 + 1
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars // 3 + (len(text) - ascii_chars) + 1
+
+
+def fits_context(prompt: str, max_tokens: int, context_tokens: int = CLAUDE_3_CONTEXT_TOKENS) -> bool:
+    """Whether prompt plus a reply of up to max_tokens fits in the context window"""
+    return estimate_tokens(prompt) + max_tokens <= context_tokens
+
+
+# Initialize with Claude 3 Opus
+claude_assistant_llm = LLM(model="claude-3-opus-20240229", temperature=0.7)
+
+
 @chatbot(stream=False)
 async def claude_assistant(prompt: str):
     """
@@ -22,15 +54,15 @@ async def claude_assistant(prompt: str):
     Make sure to set your Anthropic API key:
     export ANTHROPIC_API_KEY=your-api-key-here
     """
-    # Initialize with Claude 3 Opus
-    llm = LLM(model="claude-3-opus-20240229", temperature=0.7)
-    
     # Get the complete response
-    response = await llm.acomplete(prompt)
+    response = await claude_assistant_llm.acomplete(prompt)
     
     return Text(response)
 
 
+claude_sonnet_assistant_llm = LLM(model="claude-3-sonnet-20240229", temperature=0.5)
+
+
 @chatbot(stream=False)
 async def claude_sonnet_assistant(prompt: str):
     """
@@ -41,10 +73,8 @@ async def claude_sonnet_assistant(prompt: str):
     - More cost-effective than Opus
     - Great for most use cases
     """
-    llm = LLM(model="claude-3-sonnet-20240229", temperature=0.5)
-    
     # Get the response
-    response = await llm.acomplete(prompt)
+    response = await claude_sonnet_assistant_llm.acomplete(prompt)
     
     # Return formatted response
     return [
@@ -59,6 +89,15 @@ async def claude_sonnet_assistant(prompt: str):
     ]
 
 
+# Built once and reused, since the footer is the same on every reply
+HAIKU_FOOTER = [
+    Text(""),
+    Text("⚡ Powered by Claude 3 Haiku - Fast and efficient!")
+]
+
+claude_haiku_assistant_llm = LLM(model="claude-3-haiku-20240307", temperature=0.5)
+
+
 @chatbot(stream=False)
 async def claude_haiku_assistant(prompt: str):
     """
@@ -69,17 +108,23 @@ async def claude_haiku_assistant(prompt: str):
     - Most cost-effective option
     - Great for simple queries
     """
-    llm = LLM(model="claude-3-haiku-20240307", temperature=0.5)
-    
-    response = await llm.acomplete(prompt)
+    response = await claude_haiku_assistant_llm.acomplete(prompt)
     
     return [
         Text(response),
-        Text(""),
-        Text("⚡ Powered by Claude 3 Haiku - Fast and efficient!")
+        *HAIKU_FOOTER
     ]
 
 
+# Reply budget, shared by the LLM and the prompt size check so they agree
+RESEARCHER_MAX_TOKENS = 3000
+claude_researcher_llm = LLM(
+    model="claude-3-sonnet-20240229",
+    temperature=0.3,  # Lower for research accuracy
+    max_tokens=RESEARCHER_MAX_TOKENS
+)
+
+
 @chatbot(stream=False)
 async def claude_researcher(prompt: str):
     """
@@ -90,11 +135,8 @@ async def claude_researcher(prompt: str):
     - Provides multiple perspectives
     - Cites considerations and caveats
     """
-    llm = LLM(
-        model="claude-3-sonnet-20240229",
-        temperature=0.3,  # Lower for research accuracy
-        max_tokens=3000
-    )
+    if not fits_context(prompt, max_tokens=RESEARCHER_MAX_TOKENS):
+        return TOO_LONG_REPLY
     
     # Research-oriented system prompt
     messages = [
@@ -106,7 +148,7 @@ async def claude_researcher(prompt: str):
     ]
     
     # Get comprehensive analysis
-    response = llm.with_messages(messages)
+    response = await asyncio.to_thread(claude_researcher_llm.with_messages, messages)
     
     return Markdown(f"""
 ## 🔍 Research Analysis
@@ -118,6 +160,14 @@ async def claude_researcher(prompt: str):
     """)
 
 
+WRITER_MAX_TOKENS = 2000
+claude_writer_llm = LLM(
+    model="claude-3-sonnet-20240229",
+    temperature=0.8,  # Higher for creative writing
+    max_tokens=WRITER_MAX_TOKENS
+)
+
+
 @chatbot(stream=False)
 async def claude_writer(prompt: str):
     """
@@ -128,15 +178,15 @@ async def claude_writer(prompt: str):
     - Adapts tone and style as needed
     - Provides polished content
     """
-    llm = LLM(
-        model="claude-3-sonnet-20240229",
-        temperature=0.8,  # Higher for creative writing
-        max_tokens=2000
-    )
+    if not fits_context(prompt, max_tokens=WRITER_MAX_TOKENS):
+        return TOO_LONG_REPLY
     
     # Analyze the type of writing needed
     analysis_prompt = f"What type of writing is this request asking for (e.g., creative, business, technical, academic)? Request: {prompt}"
-    writing_type = await llm.acomplete(analysis_prompt)
+    writing_type = await claude_writer_llm.acomplete(analysis_prompt)
+    # The answer is free-form model output, so keep only a short first line
+    # before building the system prompt and heading from it
+    writing_type = writing_type.strip().split("\n", 1)[0][:80]
     
     # Generate the content
     messages = [
@@ -147,7 +197,7 @@ async def claude_writer(prompt: str):
         {"role": "user", "content": prompt}
     ]
     
-    content = llm.with_messages(messages)
+    content = await asyncio.to_thread(claude_writer_llm.with_messages, messages)
     
     return [
         Markdown(f"## ✍️ Writing Type: {writing_type}"),
@@ -159,6 +209,14 @@ async def claude_writer(prompt: str):
     ]
 
 
+TUTOR_MAX_TOKENS = 2500
+claude_tutor_llm = LLM(
+    model="claude-3-sonnet-20240229",
+    temperature=0.5,
+    max_tokens=TUTOR_MAX_TOKENS
+)
+
+
 @chatbot(stream=False)
 async def claude_tutor(prompt: str):
     """
@@ -169,11 +227,8 @@ async def claude_tutor(prompt: str):
     - Provides examples and exercises
     - Checks understanding
     """
-    llm = LLM(
-        model="claude-3-sonnet-20240229",
-        temperature=0.5,
-        max_tokens=2500
-    )
+    if not fits_context(prompt, max_tokens=TUTOR_MAX_TOKENS):
+        return TOO_LONG_REPLY
     
     # Educational system prompt
     messages = [
@@ -184,12 +239,15 @@ async def claude_tutor(prompt: str):
         {"role": "user", "content": prompt}
     ]
     
-    # Get educational content
-    response = llm.with_messages(messages)
-    
     # Add a practice question
     practice_prompt = f"Create a simple practice question related to: {prompt}"
-    practice_question = await llm.acomplete(practice_prompt)
+    
+    # The lesson and the practice question only depend on the prompt,
+    # so generate them at the same time
+    response, practice_question = await asyncio.gather(
+        asyncio.to_thread(claude_tutor_llm.with_messages, messages),
+        claude_tutor_llm.acomplete(practice_prompt)
+    )
     
     return [
         Markdown("## 📖 Learning Session"),
@@ -202,6 +260,14 @@ async def claude_tutor(prompt: str):
     ]
 
 
+DEBATE_MAX_TOKENS = 3000
+claude_debate_bot_llm = LLM(
+    model="claude-3-sonnet-20240229",
+    temperature=0.4,
+    max_tokens=DEBATE_MAX_TOKENS
+)
+
+
 @chatbot(stream=False)
 async def claude_debate_bot(prompt: str):
     """
@@ -212,35 +278,35 @@ async def claude_debate_bot(prompt: str):
     - Maintains objectivity
     - Encourages critical thinking
     """
-    llm = LLM(
-        model="claude-3-sonnet-20240229",
-        temperature=0.4,
-        max_tokens=3000
-    )
-    
-    # Generate multiple perspectives
-    perspectives = []
+    if not fits_context(prompt, max_tokens=DEBATE_MAX_TOKENS):
+        return TOO_LONG_REPLY
     
     # Pro argument
     pro_msg = [
         {"role": "system", "content": "Present strong arguments in favor of the given topic."},
         {"role": "user", "content": prompt}
     ]
-    pro_response = llm.with_messages(pro_msg)
     
     # Con argument
     con_msg = [
         {"role": "system", "content": "Present strong arguments against or questioning the given topic."},
         {"role": "user", "content": prompt}
     ]
-    con_response = llm.with_messages(con_msg)
     
     # Balanced view
     balanced_msg = [
         {"role": "system", "content": "Provide a balanced, nuanced view considering multiple perspectives."},
         {"role": "user", "content": prompt}
     ]
-    balanced_response = llm.with_messages(balanced_msg)
+    
+    # The three perspectives are independent, so request them concurrently.
+    # with_messages blocks, so each call runs in a worker thread and the
+    # event loop stays free for other sessions while we wait.
+    pro_response, con_response, balanced_response = await asyncio.gather(
+        asyncio.to_thread(claude_debate_bot_llm.with_messages, pro_msg),
+        asyncio.to_thread(claude_debate_bot_llm.with_messages, con_msg),
+        asyncio.to_thread(claude_debate_bot_llm.with_messages, balanced_msg)
+    )
     
     return [
         Markdown(f"## 🤔 Multiple Perspectives on: {prompt}"),
@@ -259,6 +325,77 @@ async def claude_debate_bot(prompt: str):
     ]
 
 
+# Signs that a prompt needs the larger model: code, or analytical questions
+COMPLEX_PROMPT = re.compile(
+    r"```|\b(?:def|class|import|function|explain|why|compare|analy[sz]e|design|"
+    r"prove|derive|evaluate|trade-?offs?|step by step)\b",
+    re.IGNORECASE
+)
+# How long Haiku gets before Opus is asked as well
+HAIKU_DEADLINE_SECONDS = 5.0
+
+
+def is_complex_prompt(prompt: str) -> bool:
+    """Cheap local guess at whether a prompt needs Opus rather than Haiku"""
+    if len(prompt) > 600 or prompt.count("\n") > 5:
+        return True
+    return COMPLEX_PROMPT.search(prompt) is not None
+
+
+async def hedged_complete(prompt: str, deadline: float):
+    """
+    Ask Haiku first and bring in Opus if Haiku fails or misses the deadline
+    
+    Returns (response, model name) from whichever model succeeds first and
+    raises only if both fail. Calls still running when this returns (or is
+    cancelled) are cancelled so no paid request is left behind.
+    """
+    fast = asyncio.create_task(claude_haiku_assistant_llm.acomplete(prompt))
+    models = {fast: "Claude 3 Haiku"}
+    try:
+        done, _ = await asyncio.wait({fast}, timeout=deadline)
+        if done and fast.exception() is None:
+            return fast.result(), models[fast]
+    
+        slow = asyncio.create_task(claude_assistant_llm.acomplete(prompt))
+        models[slow] = "Claude 3 Opus"
+        pending = {task for task in models if not task.done()}
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            succeeded = [task for task in done if task.exception() is None]
+            if succeeded:
+                return succeeded[0].result(), models[succeeded[0]]
+    
+        # Both calls failed; surface the error from the Opus fallback
+        return slow.result(), models[slow]
+    finally:
+        for task in models:
+            task.cancel()
+
+
+@chatbot(stream=False)
+async def claude_auto_assistant(prompt: str):
+    """
+    An assistant that picks the Claude model for each prompt
+    
+    This bot:
+    - Sends short, simple prompts to Claude 3 Haiku
+    - Sends long, code-heavy or analytical prompts to Claude 3 Opus
+    - Asks Opus as well if Haiku hasn't answered within a few seconds
+    """
+    if is_complex_prompt(prompt):
+        response = await claude_assistant_llm.acomplete(prompt)
+        model = "Claude 3 Opus"
+    else:
+        response, model = await hedged_complete(prompt, HAIKU_DEADLINE_SECONDS)
+    
+    return [
+        Text(response),
+        Text(""),
+        Text(f"🧭 Answered by {model}")
+    ]
+
+
 if __name__ == "__main__":
     # Run the Claude Sonnet assistant by default
     from bubbletea_chat import run_server
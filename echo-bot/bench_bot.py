@@ -0,0 +1,247 @@
+"""
+Load-testing and benchmark script for BubbleTea bots
+
+Drives a bot's /chat endpoint with concurrent requests and reports
+throughput, latency percentiles and time to first byte. Results can be
+written to a JSON file so runs before and after an SDK upgrade can be
+compared.
+
+Examples:
+    # Benchmark a bot that is already running
+    python bench_bot.py --url http://localhost:8000 --requests 500 --concurrency 50
+
+    # Start the bot script, benchmark it and stop it again
+    python bench_bot.py --bot bots/echo_bot.py --output results.json
+
+    # Measure an LLM bot's framework overhead without provider keys or network
+    python bench_bot.py --bot ../claude-bot/bots/claude_assistant.py --fake-llm --url http://localhost:8007
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+
+import httpx
+
+
+def percentile(values, pct):
+    """Return the pct-th percentile of values (nearest-rank)"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+    return ordered[rank]
+
+
+def read_rss_kb(pid):
+    """Resident memory of a process in KB, or None where /proc is unavailable"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+async def wait_for_server(client, base_url, timeout):
+    """Poll /health until the server answers or timeout seconds pass"""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            response = await client.get(f"{base_url}/health")
+            if response.status_code == 200:
+                return response.json()
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.2)
+    return None
+
+
+async def check_health(base_url, timeout):
+    """Wait for the server at base_url to report healthy"""
+    async with httpx.AsyncClient(timeout=5) as client:
+        return await wait_for_server(client, base_url, timeout)
+
+
+async def timed_request(client, base_url, payload):
+    """Send one chat request and return (ok, first byte seconds, total seconds, bytes)"""
+    start = time.perf_counter()
+    first_byte = None
+    size = 0
+    async with client.stream("POST", f"{base_url}/chat", json=payload) as response:
+        async for data in response.aiter_bytes():
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            size += len(data)
+    total = time.perf_counter() - start
+    return response.status_code == 200, first_byte or total, total, size
+
+
+async def run_benchmark(base_url, payload, num_requests, concurrency, warmup, trace=None, trace_sample=1.0):
+    """
+    Fire num_requests requests with at most concurrency in flight
+
+    If trace is a list, a timing record is appended to it for every failed
+    request and for a trace_sample fraction of the successful ones.
+    """
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(limits=limits, timeout=120) as client:
+        for _ in range(warmup):
+            await timed_request(client, base_url, payload)
+
+        semaphore = asyncio.Semaphore(concurrency)
+        results = []
+        errors = 0
+
+        async def worker(index):
+            nonlocal errors
+            async with semaphore:
+                sent_at = time.perf_counter() - start
+                try:
+                    ok, first_byte, total, size = await timed_request(client, base_url, payload)
+                except httpx.HTTPError as error:
+                    errors += 1
+                    if trace is not None:
+                        trace.append({"request": index, "start_ms": sent_at * 1000, "error": repr(error)})
+                    return
+                if ok:
+                    results.append((first_byte, total, size))
+                else:
+                    errors += 1
+                # Failed requests are always traced; sampling applies to successes
+                if trace is not None and (not ok or random.random() < trace_sample):
+                    trace.append({
+                        "request": index,
+                        "start_ms": sent_at * 1000,
+                        "first_byte_ms": first_byte * 1000,
+                        "total_ms": total * 1000,
+                        "bytes": size,
+                        "ok": ok,
+                    })
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker(index) for index in range(num_requests)))
+        elapsed = time.perf_counter() - start
+
+    latencies = [total for _, total, _ in results]
+    first_bytes = [first_byte for first_byte, _, _ in results]
+    return {
+        "requests": num_requests,
+        "concurrency": concurrency,
+        "succeeded": len(results),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(results) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 50) * 1000,
+            "p95": percentile(latencies, 95) * 1000,
+            "p99": percentile(latencies, 99) * 1000,
+            "max": max(latencies, default=0.0) * 1000,
+        },
+        "first_byte_ms": {
+            "p50": percentile(first_bytes, 50) * 1000,
+            "p95": percentile(first_bytes, 95) * 1000,
+            "p99": percentile(first_bytes, 99) * 1000,
+        },
+        "response_bytes": sum(size for _, _, size in results),
+    }
+
+
+def start_bot(script, fake_llm=False):
+    """Run a bot script in a child process, optionally on the fake LLM backend"""
+    if fake_llm:
+        runner = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_llm.py")
+        return subprocess.Popen([sys.executable, runner, script])
+    return subprocess.Popen([sys.executable, script])
+
+
+def print_report(report):
+    """Pretty-print a benchmark report"""
+    print(f"\n{'='*30}")
+    print(f"📊 {report['succeeded']}/{report['requests']} requests succeeded "
+          f"({report['errors']} errors) in {report['elapsed_s']:.2f}s")
+    print(f"   Throughput: {report['throughput_rps']:.1f} req/s")
+    latency = report["latency_ms"]
+    print(f"   Latency:    p50 {latency['p50']:.1f} ms | p95 {latency['p95']:.1f} ms | "
+          f"p99 {latency['p99']:.1f} ms | max {latency['max']:.1f} ms")
+    first_byte = report["first_byte_ms"]
+    print(f"   First byte: p50 {first_byte['p50']:.1f} ms | p95 {first_byte['p95']:.1f} ms | "
+          f"p99 {first_byte['p99']:.1f} ms")
+    if report.get("server_rss_kb") is not None:
+        print(f"   Server RSS: {report['server_rss_kb']} KB "
+              f"({report['rss_growth_per_request_kb']:.2f} KB growth per request)")
+
+
+def main():
+    """Main benchmark runner"""
+    parser = argparse.ArgumentParser(description="Benchmark a BubbleTea bot")
+    parser.add_argument("--url", default="http://localhost:8000", help="Base URL of the bot server")
+    parser.add_argument("--bot", help="Bot script to start before benchmarking (stopped afterwards)")
+    parser.add_argument("--fake-llm", action="store_true",
+                        help="Start --bot with the offline fake LLM backend (see fake_llm.py)")
+    parser.add_argument("--message", default="Hello echo bot!", help="Message to send")
+    parser.add_argument("--requests", type=int, default=200, help="Total number of requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--warmup", type=int, default=5, help="Requests sent before measuring")
+    parser.add_argument("--output", help="Write the report to this JSON file")
+    parser.add_argument("--trace", help="Write per-request timing records to this JSON Lines file")
+    parser.add_argument("--trace-sample", type=float, default=1.0,
+                        help="Fraction of successful requests to trace (errors are always traced)")
+    args = parser.parse_args()
+
+    print("🏎️  BubbleTea Bot Benchmark")
+    print("=" * 30)
+
+    process = start_bot(args.bot, args.fake_llm) if args.bot else None
+    try:
+        health = asyncio.run(check_health(args.url, 30 if process else 5))
+        if health is None:
+            print(f"❌ Cannot reach {args.url}/health. Make sure the bot is running.")
+            sys.exit(1)
+        print(f"Bot: {health.get('bot_name')} | Streaming: {health.get('streaming')}")
+        print(f"Sending {args.requests} requests, {args.concurrency} at a time...")
+
+        rss_before = read_rss_kb(process.pid) if process else None
+        payload = {"type": "user", "message": args.message}
+        trace = [] if args.trace else None
+        report = asyncio.run(run_benchmark(
+            args.url, payload, args.requests, args.concurrency, args.warmup,
+            trace, args.trace_sample
+        ))
+        report["bot_name"] = health.get("bot_name")
+        report["streaming"] = health.get("streaming")
+        report["message_chars"] = len(args.message)
+
+        rss_after = read_rss_kb(process.pid) if process else None
+        if rss_before is not None and rss_after is not None:
+            report["server_rss_kb"] = rss_after
+            report["rss_growth_per_request_kb"] = (rss_after - rss_before) / args.requests
+    finally:
+        if process:
+            process.terminate()
+            process.wait(timeout=10)
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2)
+        print(f"\n💾 Report written to {os.path.abspath(args.output)}")
+
+    if args.trace:
+        with open(args.trace, "w") as trace_file:
+            for record in sorted(trace, key=lambda record: record["start_ms"]):
+                trace_file.write(json.dumps(record) + "\n")
+        print(f"🧵 {len(trace)} request traces written to {os.path.abspath(args.trace)}")
+
+
+if __name__ == "__main__":
+    main()
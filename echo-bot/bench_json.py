@@ -0,0 +1,164 @@
+"""
+JSON encoder benchmark for chat responses
+
+Compares ways of encoding a /chat response body ({"responses": [...]})
+and per-component streaming frames, using a large multi-section Markdown
+response shaped like claude_debate_bot's output.
+
+Encoders:
+- stdlib json, configured the way FastAPI/Starlette's JSONResponse does it
+- orjson and msgspec, if installed (pip install orjson msgspec)
+- pydantic model_dump / model_dump_json on real bubbletea_chat components,
+  if bubbletea_chat is installed
+
+Usage:
+    python bench_json.py --size-kb 64 --output json_bench.json
+"""
+
+import argparse
+import json
+import timeit
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    from bubbletea_chat import Text, Markdown
+except ImportError:
+    Text = Markdown = None
+
+
+PARAGRAPH = (
+    "- **Point**: a well-structured argument with *emphasis*, `inline code` "
+    "and a [link](https://bubbletea.chat) — plus a little unicode: ✅ ❌ ⚖️\n"
+)
+
+
+def debate_layout(size_kb):
+    """(type, content) pairs laid out like claude_debate_bot's response"""
+    section = PARAGRAPH * max(1, size_kb * 1024 // (3 * len(PARAGRAPH)))
+    return [
+        ("markdown", "## 🤔 Multiple Perspectives on: benchmark topic"),
+        ("text", ""),
+        ("markdown", "### ✅ Arguments For"),
+        ("markdown", section),
+        ("text", ""),
+        ("markdown", "### ❌ Arguments Against"),
+        ("markdown", section),
+        ("text", ""),
+        ("markdown", "### ⚖️ Balanced Perspective"),
+        ("markdown", section),
+        ("text", ""),
+        ("markdown", "---"),
+        ("text", "Remember: Critical thinking means considering all sides!"),
+    ]
+
+
+def stdlib_dumps(content):
+    """Encode like Starlette's JSONResponse.render"""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def build_cases(layout):
+    """Map encoder name -> (encode whole body, encode one frame per component)"""
+    dicts = [{"type": kind, "content": content} for kind, content in layout]
+    cases = {
+        "stdlib json (dicts)": (
+            lambda: stdlib_dumps({"responses": dicts}),
+            lambda: [stdlib_dumps(item) for item in dicts],
+        ),
+    }
+
+    if orjson is not None:
+        cases["orjson (dicts)"] = (
+            lambda: orjson.dumps({"responses": dicts}),
+            lambda: [orjson.dumps(item) for item in dicts],
+        )
+
+    if msgspec is not None:
+        class Component(msgspec.Struct):
+            type: str
+            content: str
+
+        class ChatResponse(msgspec.Struct):
+            responses: list
+
+        structs = [Component(kind, content) for kind, content in layout]
+        encoder = msgspec.json.Encoder()
+        cases["msgspec (structs)"] = (
+            lambda: encoder.encode(ChatResponse(structs)),
+            lambda: [encoder.encode(item) for item in structs],
+        )
+
+    if Markdown is not None:
+        components = [Markdown(content) if kind == "markdown" else Text(content) for kind, content in layout]
+        cases["pydantic model_dump + stdlib json"] = (
+            lambda: stdlib_dumps({"responses": [c.model_dump() for c in components]}),
+            lambda: [stdlib_dumps(c.model_dump()) for c in components],
+        )
+        cases["pydantic model_dump_json"] = (
+            lambda: b'{"responses":[' + b",".join(c.model_dump_json().encode() for c in components) + b"]}",
+            lambda: [c.model_dump_json().encode() for c in components],
+        )
+        if orjson is not None:
+            cases["pydantic model_dump + orjson"] = (
+                lambda: orjson.dumps({"responses": [c.model_dump() for c in components]}),
+                lambda: [orjson.dumps(c.model_dump()) for c in components],
+            )
+
+    return cases
+
+
+def measure(func, number, repeat):
+    """Best time per call in microseconds"""
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1e6
+
+
+def main():
+    """Run the encoder comparison"""
+    parser = argparse.ArgumentParser(description="Compare JSON encoders on chat responses")
+    parser.add_argument("--size-kb", type=int, default=64, help="Approximate response size in KB")
+    parser.add_argument("--number", type=int, default=200, help="Calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs (best is reported)")
+    parser.add_argument("--output", help="Write results to this JSON file")
+    args = parser.parse_args()
+
+    layout = debate_layout(args.size_kb)
+    cases = build_cases(layout)
+    body_size = len(stdlib_dumps({"responses": [{"type": k, "content": c} for k, c in layout]}))
+
+    print("🧮 Chat Response Encoder Benchmark")
+    print("=" * 30)
+    print(f"{len(layout)} components, {body_size / 1024:.1f} KB body")
+    for missing, name in ((orjson, "orjson"), (msgspec, "msgspec"), (Markdown, "bubbletea_chat")):
+        if missing is None:
+            print(f"   (skipping {name}: not installed)")
+    print()
+    print(f"{'Encoder':<36} {'Body (µs)':>12} {'Frames (µs)':>12}   Body speedup")
+
+    results = {}
+    baseline = None
+    for name, (encode_body, encode_frames) in cases.items():
+        body_us = measure(encode_body, args.number, args.repeat)
+        frames_us = measure(encode_frames, args.number, args.repeat)
+        baseline = baseline or body_us
+        results[name] = {"body_us": body_us, "frames_us": frames_us}
+        print(f"{name:<36} {body_us:>12.1f} {frames_us:>12.1f}   {baseline / body_us:.1f}x")
+
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump({"size_kb": args.size_kb, "body_bytes": body_size, "results": results}, output, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Echo Bot - Simple non-streaming bot for testing basic functionality
 import sys
 import os
 import random
+import string
 
 import bubbletea_chat as bt
 
@@ -17,6 +18,47 @@ SAMPLE_IMAGES = [
     "https://source.unsplash.com/400x300/?technology",
 ]
 
+# ASCII whitespace as str.split() sees it, and ASCII uppercase letters
+ASCII_WHITESPACE = b"\t\n\x0b\x0c\r\x1c\x1d\x1e\x1f "
+ASCII_UPPERCASE = string.ascii_uppercase.encode()
+# Maps whitespace bytes to b" " and all others to b"x", so each word starts at a b" x"
+WORD_BOUNDARY_TABLE = bytes(32 if byte in ASCII_WHITESPACE else 120 for byte in range(256))
+
+IMAGE_WORDS = ("image", "picture", "photo", "show")
+HELP_WORDS = ("help", "what", "how")
+
+
+def message_stats(message: str) -> dict:
+    """
+    Word, character and uppercase counts plus keyword flags for a message
+    
+    ASCII messages, including large pasted payloads, are counted with
+    bytes.translate. That runs in C without building a list of words or
+    looping over characters in Python. Other messages fall back to
+    str.split and str.isupper. The message is lowercased once for all
+    keyword checks.
+    """
+    if message.isascii():
+        data = message.encode("ascii")
+        boundaries = data.translate(WORD_BOUNDARY_TABLE)
+        word_count = boundaries.count(b" x") + int(boundaries.startswith(b"x"))
+        uppercase_count = len(data) - len(data.translate(None, ASCII_UPPERCASE))
+    else:
+        word_count = len(message.split())
+        uppercase_count = sum(map(str.isupper, message))
+    
+    lowered = message.lower()
+    return {
+        "words": word_count,
+        "characters": len(message),
+        "uppercase_ratio": uppercase_count / len(message) * 100 if message else 0.0,
+        "has_question": "?" in message,
+        "has_exclamation": "!" in message,
+        "wants_image": any(word in lowered for word in IMAGE_WORDS),
+        "wants_help": any(word in lowered for word in HELP_WORDS),
+    }
+
+
 @bt.chatbot(name="echo-bot", stream=False)
 def echo_bot(message: str):
     """
@@ -34,29 +76,26 @@ def echo_bot(message: str):
     responses.append(bt.Text(f"🔄 Echo: {message}"))
     
     # Message analysis
-    word_count = len(message.split())
-    char_count = len(message)
-    has_question = "?" in message
-    has_exclamation = "!" in message
+    stats = message_stats(message)
     
     responses.append(bt.Markdown(f"""
 ## 📊 Message Analysis
-- **Words**: {word_count}
-- **Characters**: {char_count}
-- **Contains question**: {"Yes" if has_question else "No"}
-- **Contains exclamation**: {"Yes" if has_exclamation else "No"}
-- **Uppercase ratio**: {sum(1 for c in message if c.isupper()) / len(message) * 100:.1f}%
+- **Words**: {stats["words"]}
+- **Characters**: {stats["characters"]}
+- **Contains question**: {"Yes" if stats["has_question"] else "No"}
+- **Contains exclamation**: {"Yes" if stats["has_exclamation"] else "No"}
+- **Uppercase ratio**: {stats["uppercase_ratio"]:.1f}%
     """))
     
     # Conditional responses based on message content
-    if any(word in message.lower() for word in ["image", "picture", "photo", "show"]):
+    if stats["wants_image"]:
         responses.append(bt.Text("🖼️ I see you want an image! Here you go:"))
         responses.append(bt.Image(
             random.choice(SAMPLE_IMAGES),
             alt="Random image based on your request"
         ))
     
-    if any(word in message.lower() for word in ["help", "what", "how"]):
+    if stats["wants_help"]:
         responses.append(bt.Markdown("""
 ### 🆘 Echo Bot Help
 I'm a simple echo bot that can:
@@ -83,4 +122,4 @@ if __name__ == "__main__":
     print("Server: http://localhost:8000")
     print("Test: curl -X POST 'http://localhost:8000/chat' -H 'Content-Type: application/json' -d '{\"type\": \"user\", \"message\": \"Hello echo bot!\"}'")
     
-    bt.run_server(echo_bot, port=8009)
\ No newline at end of file
+    bt.run_server(echo_bot, port=8000)
\ No newline at end of file
@@ -0,0 +1,134 @@
+"""
+Deterministic fake LLM backend for offline testing and benchmarking
+
+FakeLLM has the same methods the example bots use on bubbletea_chat.LLM,
+but it never touches the network. Output is generated from a seed and the
+prompt, so the same request always gets the same answer, and latency is
+simulated so streaming and non-streaming bots behave realistically.
+
+Run any bot script with the fake backend installed:
+    python fake_llm.py ../claude-bot/bots/claude_assistant.py
+
+Simulation settings (environment variables):
+    BT_FAKE_TTFT         seconds before the first token (default 0.2)
+    BT_FAKE_TOKEN_DELAY  seconds between tokens (default 0.01)
+    BT_FAKE_TOKENS       tokens per response (default 50)
+    BT_FAKE_SEED         seed for generated text (default 0)
+    BT_FAKE_RESPONSE     fixed response text instead of generated words
+"""
+
+import asyncio
+import hashlib
+import os
+import random
+import runpy
+import sys
+import time
+
+WORDS = [
+    "the", "model", "response", "bubble", "tea", "chat", "quickly", "answers",
+    "with", "a", "simple", "example", "of", "streamed", "text", "and", "data",
+    "image", "analysis", "shows", "clear", "results", "for", "every", "user",
+]
+
+
+class FakeLLM:
+    """Drop-in stand-in for bubbletea_chat.LLM with scripted, seeded output"""
+
+    def __init__(self, model: str = "fake/default", **kwargs):
+        self.model = model
+        self.kwargs = kwargs
+        self.ttft = float(os.environ.get("BT_FAKE_TTFT", "0.2"))
+        self.token_delay = float(os.environ.get("BT_FAKE_TOKEN_DELAY", "0.01"))
+        self.num_tokens = int(os.environ.get("BT_FAKE_TOKENS", "50"))
+        self.seed = os.environ.get("BT_FAKE_SEED", "0")
+        self.fixed_response = os.environ.get("BT_FAKE_RESPONSE")
+
+    def _tokens(self, prompt) -> list:
+        """Tokens of the response to prompt, identical for identical input"""
+        if self.fixed_response is not None:
+            words = self.fixed_response.split(" ")
+        else:
+            key = f"{self.seed}:{self.model}:{prompt}".encode()
+            rng = random.Random(hashlib.sha256(key).digest())
+            words = [rng.choice(WORDS) for _ in range(self.num_tokens)]
+        return [word if i == 0 else " " + word for i, word in enumerate(words)]
+
+    def _total_delay(self, tokens: list) -> float:
+        """Simulated time to produce a whole response"""
+        return self.ttft + self.token_delay * len(tokens)
+
+    async def acomplete(self, prompt: str, **kwargs) -> str:
+        """Return the full response after the simulated generation time"""
+        tokens = self._tokens(prompt)
+        await asyncio.sleep(self._total_delay(tokens))
+        return "".join(tokens)
+
+    def complete(self, prompt: str, **kwargs) -> str:
+        """Blocking version of acomplete"""
+        tokens = self._tokens(prompt)
+        time.sleep(self._total_delay(tokens))
+        return "".join(tokens)
+
+    def with_messages(self, messages: list, **kwargs) -> str:
+        """Blocking chat completion, like the real with_messages"""
+        tokens = self._tokens(repr(messages))
+        time.sleep(self._total_delay(tokens))
+        return "".join(tokens)
+
+    async def stream(self, prompt: str, **kwargs):
+        """Yield tokens after the time to first token, then one per token delay"""
+        await asyncio.sleep(self.ttft)
+        for token in self._tokens(prompt):
+            yield token
+            await asyncio.sleep(self.token_delay)
+
+    async def acomplete_with_images(self, prompt: str, images: list, **kwargs) -> str:
+        """acomplete, with the images folded into the seed"""
+        return await self.acomplete(_with_image_keys(prompt, images))
+
+    async def stream_with_images(self, prompt: str, images: list, **kwargs):
+        """stream, with the images folded into the seed"""
+        async for token in self.stream(_with_image_keys(prompt, images)):
+            yield token
+
+    async def agenerate_image(self, prompt: str, **kwargs) -> str:
+        """Return a placeholder image URL that is stable per prompt"""
+        await asyncio.sleep(self.ttft)
+        digest = hashlib.sha256(f"{self.seed}:{prompt}".encode()).hexdigest()[:12]
+        return f"https://picsum.photos/seed/{digest}/512/512"
+
+
+def _with_image_keys(prompt: str, images: list) -> str:
+    """Fold the images into the prompt so different images give different output"""
+    keys = [getattr(image, "url", None) or _base64_key(getattr(image, "base64", None) or "") for image in images]
+    return f"{prompt}|{'|'.join(keys)}"
+
+
+def _base64_key(data: str) -> str:
+    """Short content hash of a base64 payload"""
+    return hashlib.sha256(data.encode()).hexdigest()[:16]
+
+
+def install():
+    """Replace bubbletea_chat.LLM with FakeLLM for bots imported afterwards"""
+    import bubbletea_chat
+    bubbletea_chat.LLM = FakeLLM
+
+
+def main():
+    """Run a bot script with the fake backend installed"""
+    if len(sys.argv) != 2:
+        print("Usage: python fake_llm.py path/to/bot.py")
+        sys.exit(1)
+
+    bot_path = os.path.abspath(sys.argv[1])
+    # Let the bot import modules that sit next to it, as it would when run directly
+    sys.path.insert(0, os.path.dirname(bot_path))
+    install()
+    print(f"🧪 Running {sys.argv[1]} with the fake LLM backend")
+    runpy.run_path(bot_path, run_name="__main__")
+
+
+if __name__ == "__main__":
+    main()
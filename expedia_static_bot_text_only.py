@@ -69,16 +69,52 @@ conversation = [
     },
 ]
 
+def compile_flow(script):
+    """
+    Turn a scripted conversation into numbered steps
+    
+    Returns the agent's opening response plus one (expected reply, agent
+    response, retry prompt) entry per user turn. Every component is built
+    here, once, so a turn only looks up its step. A session then only has
+    to remember the index of its current step in chat.state, instead of
+    keeping a suspended generator alive for every conversation.
+    """
+    opening = []
+    flow = []
+    for turn in script:
+        if turn["sender"] == "agent":
+            (flow[-1][1] if flow else opening).append(turn["content"])
+        else:
+            flow.append((turn["expected"], []))
+    
+    def as_response(contents):
+        return contents[0] if len(contents) == 1 else contents
+    
+    return as_response(opening), [
+        (expected, as_response(contents), bt.Text(f"Please type exactly: {expected}"))
+        for expected, contents in flow
+    ]
+
+opening, flow = compile_flow(conversation)
+completed = bt.Text("✅ Your trip is already booked! Want to plan another? Just refresh the session.")
+
 @bt.chatbot
-def expedia_bot():
-    for step in conversation:
-        if step["sender"] == "agent":
-            yield step["content"]
-        elif step["sender"] == "user":
-            user_input = yield
-            while user_input.strip() != step["expected"]:
-                yield bt.Text(f"Please type exactly: {step['expected']}")
-                user_input = yield
+def expedia_bot(chat: bt.Chat):
+    step = chat.state.get("step")
+    
+    if step is None:
+        # New session: greet whatever the first message was
+        chat.state["step"] = 0
+        return opening
+    
+    if step < len(flow):
+        expected, response, retry_prompt = flow[step]
+        if chat.last_user_message().strip() == expected:
+            chat.state["step"] = step + 1
+            return response
+        return retry_prompt
+    
+    return completed
 
 if __name__ == "__main__":
-    run_server(expedia_bot)
+    run_server(expedia_bot, port=8002)
@@ -5,10 +5,42 @@ This bot demonstrates how to use Google's Gemini models without streaming.
 Perfect for when you need complete responses before displaying them.
 """
 
+import asyncio
 import os
+import re
+from functools import lru_cache
 from bubbletea_chat import chatbot, Text, Markdown, Image, LLM
 
 
+# Gemini Pro accepts 30,720 prompt tokens and replies with up to 2,048
+GEMINI_PRO_INPUT_TOKENS = 30_720
+TOO_LONG_REPLY = Text("📏 That message is too long for me to handle in one go. Please shorten it or split it into parts.")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Rough token count of text, without loading a tokenizer
+    
+    Counts three characters per token for ASCII text, a little more than
+    English usually needs, and a whole token for each non-ASCII character,
+    since scripts such as CJK often tokenize at one per character or more.
+    It catches clearly oversized prompts; it is not an exact count.
+    """
+    if text.isascii():
+        return len(text) // 3 + 1
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return ascii_chars // 3 + (len(text) - ascii_chars) + 1
+
+
+def fits_input(prompt: str, input_tokens: int = GEMINI_PRO_INPUT_TOKENS) -> bool:
+    """Whether prompt fits in the model's prompt token limit"""
+    return estimate_tokens(prompt) <= input_tokens
+
+
+# Initialize with Gemini Pro
+gemini_assistant_llm = LLM(model="gemini/gemini-pro", temperature=0.7)
+
+
 @chatbot(stream=False)
 async def gemini_assistant(prompt: str):
     """
@@ -22,15 +54,15 @@ async def gemini_assistant(prompt: str):
     Make sure to set your Google API key:
     export GEMINI_API_KEY=your-api-key-here
     """
-    # Initialize with Gemini Pro
-    llm = LLM(model="gemini/gemini-pro", temperature=0.7)
-    
     # Get the complete response
-    response = await llm.acomplete(prompt)
+    response = await gemini_assistant_llm.acomplete(prompt)
     
     return Text(response)
 
 
+gemini_flash_assistant_llm = LLM(model="gemini/gemini-1.5-flash", temperature=0.5)
+
+
 @chatbot(stream=False)
 async def gemini_flash_assistant(prompt: str):
     """
@@ -41,10 +73,8 @@ async def gemini_flash_assistant(prompt: str):
     - Optimized for speed while maintaining quality
     - Returns formatted responses
     """
-    llm = LLM(model="gemini/gemini-1.5-flash", temperature=0.5)
-    
     # Get the response
-    response = await llm.acomplete(prompt)
+    response = await gemini_flash_assistant_llm.acomplete(prompt)
     
     # Return with metadata
     return [
@@ -59,6 +89,27 @@ async def gemini_flash_assistant(prompt: str):
     ]
 
 
+gemini_analyst_llm = LLM(
+    model="gemini/gemini-pro",
+    temperature=0.3,  # Lower for analytical tasks
+    max_tokens=2000
+)
+
+
+@lru_cache(maxsize=256)
+def gemini_analyst_answer(prompt: str) -> str:
+    """Analyze a topic, cached by prompt so repeats skip the LLM"""
+    # Add analytical context
+    messages = [
+        {
+            "role": "system",
+            "content": "You are an analytical assistant. Break down topics systematically, provide data-driven insights, and structure your responses with clear sections and bullet points."
+        },
+        {"role": "user", "content": prompt}
+    ]
+    return gemini_analyst_llm.with_messages(messages)
+
+
 @chatbot(stream=False)
 async def gemini_analyst(prompt: str):
     """
@@ -69,27 +120,22 @@ async def gemini_analyst(prompt: str):
     - Uses lower temperature for consistency
     - Formats responses with clear sections
     """
-    llm = LLM(
-        model="gemini/gemini-pro",
-        temperature=0.3,  # Lower for analytical tasks
-        max_tokens=2000
-    )
+    if not fits_input(prompt):
+        return TOO_LONG_REPLY
     
-    # Add analytical context
-    messages = [
-        {
-            "role": "system",
-            "content": "You are an analytical assistant. Break down topics systematically, provide data-driven insights, and structure your responses with clear sections and bullet points."
-        },
-        {"role": "user", "content": prompt}
-    ]
-    
-    # Get structured response
-    response = llm.with_messages(messages)
+    # Get structured response (repeated prompts are served from the cache)
+    response = await asyncio.to_thread(gemini_analyst_answer, prompt)
     
     return Markdown(response)
 
 
+gemini_creative_bot_llm = LLM(
+    model="gemini/gemini-pro",
+    temperature=0.9,  # Higher for creativity
+    max_tokens=1500
+)
+
+
 @chatbot(stream=False)
 async def gemini_creative_bot(prompt: str):
     """
@@ -100,18 +146,15 @@ async def gemini_creative_bot(prompt: str):
     - Uses higher temperature for variety
     - Returns multiple creative variations
     """
-    llm = LLM(
-        model="gemini/gemini-pro",
-        temperature=0.9,  # Higher for creativity
-        max_tokens=1500
-    )
-    
-    # Generate main creative response
-    response = await llm.acomplete(f"Create something creative based on: {prompt}")
+    if not fits_input(prompt):
+        return TOO_LONG_REPLY
     
-    # Generate a variation
+    # Generate the main creative response and a variation in parallel
     variation_prompt = f"Create a different creative take on: {prompt}"
-    variation = await llm.acomplete(variation_prompt)
+    response, variation = await asyncio.gather(
+        gemini_creative_bot_llm.acomplete(f"Create something creative based on: {prompt}"),
+        gemini_creative_bot_llm.acomplete(variation_prompt)
+    )
     
     return [
         Markdown("## Creative Response #1"),
@@ -124,6 +167,16 @@ async def gemini_creative_bot(prompt: str):
     ]
 
 
+# Prompts mentioning any of these words get an illustrative image
+VISUAL_TOPIC = re.compile(r"diagram|chart|visual|graph")
+
+gemini_educator_llm = LLM(
+    model="gemini/gemini-pro",
+    temperature=0.5,
+    max_tokens=2500
+)
+
+
 @chatbot(stream=False)
 async def gemini_educator(prompt: str):
     """
@@ -134,11 +187,8 @@ async def gemini_educator(prompt: str):
     - Provides examples and analogies
     - Structures learning content
     """
-    llm = LLM(
-        model="gemini/gemini-pro",
-        temperature=0.5,
-        max_tokens=2500
-    )
+    if not fits_input(prompt):
+        return TOO_LONG_REPLY
     
     # Educational system prompt
     messages = [
@@ -150,7 +200,7 @@ async def gemini_educator(prompt: str):
     ]
     
     # Get educational content
-    response = llm.with_messages(messages)
+    response = await asyncio.to_thread(gemini_educator_llm.with_messages, messages)
     
     # Add a visual element if relevant
     components = [
@@ -159,7 +209,7 @@ async def gemini_educator(prompt: str):
     ]
     
     # Add an illustrative image for certain topics
-    if any(word in prompt.lower() for word in ["diagram", "chart", "visual", "graph"]):
+    if VISUAL_TOPIC.search(prompt.lower()):
         components.extend([
             Text(""),
             Text("Here's a visual representation:"),
@@ -5,10 +5,16 @@ This bot demonstrates how to use OpenAI's GPT models without streaming.
 The entire response is generated before being sent to the user.
 """
 
+import asyncio
 import os
+from functools import lru_cache
 from bubbletea_chat import chatbot, Text, Markdown, LLM
 
 
+# Initialize the LLM with GPT-4
+gpt_assistant_llm = LLM(model="gpt-4", temperature=0.7)
+
+
 @chatbot(stream=False)  # Explicitly disable streaming
 async def gpt_assistant(prompt: str):
     """
@@ -22,16 +28,16 @@ async def gpt_assistant(prompt: str):
     Make sure to set your OpenAI API key:
     export OPENAI_API_KEY=your-api-key-here
     """
-    # Initialize the LLM with GPT-4
-    llm = LLM(model="gpt-4", temperature=0.7)
-    
     # Get the complete response
-    response = await llm.acomplete(prompt)
+    response = await gpt_assistant_llm.acomplete(prompt)
     
     # Return the response as a single text component
     return Text(response)
 
 
+gpt_turbo_assistant_llm = LLM(model="gpt-3.5-turbo", temperature=0.5)
+
+
 @chatbot(stream=False)
 async def gpt_turbo_assistant(prompt: str):
     """
@@ -42,10 +48,8 @@ async def gpt_turbo_assistant(prompt: str):
     - Returns formatted markdown responses
     - Includes response metadata
     """
-    llm = LLM(model="gpt-3.5-turbo", temperature=0.5)
-    
     # Get the response
-    response = await llm.acomplete(prompt)
+    response = await gpt_turbo_assistant_llm.acomplete(prompt)
     
     # Return formatted response with metadata
     return [
@@ -60,6 +64,27 @@ async def gpt_turbo_assistant(prompt: str):
     ]
 
 
+code_assistant_llm = LLM(
+    model="gpt-4",
+    temperature=0.3,  # Lower temperature for more precise code
+    max_tokens=2000
+)
+
+
+@lru_cache(maxsize=256)
+def code_assistant_answer(prompt: str) -> str:
+    """Answer a programming question, cached by prompt so repeats skip the LLM"""
+    # Add a system message for code assistance
+    messages = [
+        {
+            "role": "system", 
+            "content": "You are an expert programming assistant. Provide clear, concise code examples with explanations. Always use markdown code blocks with appropriate language tags."
+        },
+        {"role": "user", "content": prompt}
+    ]
+    return code_assistant_llm.with_messages(messages)
+
+
 @chatbot(stream=False)
 async def code_assistant(prompt: str):
     """
@@ -70,28 +95,16 @@ async def code_assistant(prompt: str):
     - Returns code with proper formatting
     - Uses lower temperature for accuracy
     """
-    llm = LLM(
-        model="gpt-4",
-        temperature=0.3,  # Lower temperature for more precise code
-        max_tokens=2000
-    )
-    
-    # Add a system message for code assistance
-    messages = [
-        {
-            "role": "system", 
-            "content": "You are an expert programming assistant. Provide clear, concise code examples with explanations. Always use markdown code blocks with appropriate language tags."
-        },
-        {"role": "user", "content": prompt}
-    ]
-    
-    # Get the complete response
-    response = llm.with_messages(messages)
+    # Get the complete response (repeated prompts are served from the cache)
+    response = await asyncio.to_thread(code_assistant_answer, prompt)
     
     # Return as markdown for better code formatting
     return Markdown(response)
 
 
+multi_response_bot_llm = LLM(model="gpt-3.5-turbo", temperature=0.7)
+
+
 @chatbot(stream=False)
 async def multi_response_bot(prompt: str):
     """
@@ -102,14 +115,12 @@ async def multi_response_bot(prompt: str):
     - Returning multiple components
     - Different response formats
     """
-    llm = LLM(model="gpt-3.5-turbo", temperature=0.7)
-    
     # Get main response
-    main_response = await llm.acomplete(prompt)
+    main_response = await multi_response_bot_llm.acomplete(prompt)
     
-    # Generate a summary
+    # Generate a summary (this needs the main response, so it runs after it)
     summary_prompt = f"Provide a one-sentence summary of this response: {main_response}"
-    summary = await llm.acomplete(summary_prompt)
+    summary = await multi_response_bot_llm.acomplete(summary_prompt)
     
     # Return multiple components
     return [
@@ -38,18 +38,24 @@ responses = [
     )
 ]
 
+# Replies that never change are built once at import instead of every turn
+retry_prompts = [bt.Text(f"Please type: '{step}' to continue.") for step in steps]
+completed = bt.Text("✅ You've completed the to-do list walkthrough! Want to start over? Just refresh the session.")
+
 @bt.chatbot
 def todo_bot(chat: bt.Chat):
     user_msg = chat.last_user_message().strip().lower()
     step = chat.state.get("step", 0)
 
     if step < len(steps) and user_msg == steps[step]:
+        # The only state is a small step index, and it is written only when
+        # it changes, so a wrong reply never touches the session state
         chat.state["step"] = step + 1
         return responses[step]
     elif step < len(steps):
-        return bt.Text(f"Please type: '{steps[step]}' to continue.")
+        return retry_prompts[step]
     else:
-        return bt.Text("✅ You've completed the to-do list walkthrough! Want to start over? Just refresh the session.")
+        return completed
 
 if __name__ == "__main__":
-    bt.run_server(todo_bot)
+    bt.run_server(todo_bot, port=8001)
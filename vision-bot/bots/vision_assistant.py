@@ -5,27 +5,137 @@ These bots demonstrate how to build multimodal AI assistants that can
 analyze images using various vision-enabled LLMs.
 """
 
+import asyncio
+import hashlib
 import os
+import re
+import time
+from collections import OrderedDict
 from bubbletea_chat import chatbot, Text, Markdown, Image, LLM, ImageInput
 
 
-@chatbot
-async def vision_assistant(message: str, images: list = None):
+async def coalesce_chunks(chunks, max_chars: int = 256, max_delay: float = 0.03):
     """
-    A general-purpose vision assistant that can analyze any image
+    Merge small streamed chunks into larger pieces
+    
+    LLM streams arrive a few characters at a time. Yielding a component
+    for each one means one object, one JSON encode and one frame per token.
+    A piece is emitted once it holds max_chars characters or max_delay
+    seconds have passed since the last one, so text still appears steadily.
+    The deadline also runs while waiting, so buffered text is not held back
+    when the provider pauses mid-stream.
+    """
+    iterator = chunks.__aiter__()
+    next_chunk = None
+    buffer = []
+    size = 0
+    last_flush = time.monotonic()
+    
+    try:
+        while True:
+            if next_chunk is None:
+                next_chunk = asyncio.ensure_future(iterator.__anext__())
+            # Only wait out the remaining budget when there is text to flush
+            timeout = max(0.0, last_flush + max_delay - time.monotonic()) if buffer else None
+            done, _ = await asyncio.wait({next_chunk}, timeout=timeout)
+    
+            if done:
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    next_chunk = None
+                    break
+                next_chunk = None
+                buffer.append(chunk)
+                size += len(chunk)
+                if size < max_chars and time.monotonic() - last_flush < max_delay:
+                    continue
+    
+            yield "".join(buffer)
+            buffer.clear()
+            size = 0
+            last_flush = time.monotonic()
+    finally:
+        if next_chunk is not None:
+            next_chunk.cancel()
+    
+    if buffer:
+        yield "".join(buffer)
+
+
+# Size of the slices image_digest encodes at a time
+DIGEST_CHUNK_SIZE = 1 << 20
+
+
+def image_digest(image: ImageInput) -> str:
+    """Content hash of an image, whether it was sent as base64 or as a URL"""
+    data = image.base64 or image.url or ""
+    digest = hashlib.sha256()
+    # Hash in slices so a multi-megabyte base64 string is never copied whole
+    for start in range(0, len(data), DIGEST_CHUNK_SIZE):
+        digest.update(data[start:start + DIGEST_CHUNK_SIZE].encode())
+    return digest.hexdigest()
+
+
+def dedupe_images(images: list) -> list:
+    """
+    Drop repeated images, keeping the first copy of each
     
-    Features:
-    - Accepts images via URL or base64
-    - Provides detailed descriptions
-    - Answers questions about images
-    - Works with multiple images
+    Every image is uploaded to the provider and billed as input tokens,
+    so sending the same screenshot twice only adds latency and cost.
+    """
+    seen = set()
+    unique = []
+    for image in images:
+        digest = image_digest(image)
+        if digest not in seen:
+            seen.add(digest)
+            unique.append(image)
+    return unique
+
+
+def match_intents(rules, message: str) -> set:
     """
-    # Use GPT-4 Vision by default (you can change to Claude 3 or Gemini)
-    llm = LLM(model="gpt-4-vision-preview", max_tokens=1000)
+    Names of every intent whose keywords occur in message
     
-    if not images:
-        # No images provided - show instructions
-        yield Markdown("""
+    rules is a compiled pattern with one named group per intent, so the
+    message is lowercased once and scanned in a single pass however many
+    keywords there are.
+    """
+    return {match.lastgroup for match in rules.finditer(message.lower())}
+
+
+# Most recent answers to image prompts, keyed by (client, image digests, prompt)
+analysis_cache = OrderedDict()
+ANALYSIS_CACHE_SIZE = 128
+
+
+async def cached_analysis(llm: LLM, prompt: str, images: list) -> str:
+    """
+    Run acomplete_with_images, reusing the answer for repeated requests
+    
+    Users often send the same screenshot again. Images are identified by
+    content hash, so a re-upload of identical pixels with the same prompt
+    is answered from memory instead of being analyzed again.
+    """
+    digests = await asyncio.to_thread(lambda: tuple(image_digest(image) for image in images))
+    # The bots' LLM clients live for the whole process, so id() is stable
+    key = (id(llm), digests, prompt)
+    
+    if key in analysis_cache:
+        analysis_cache.move_to_end(key)
+        return analysis_cache[key]
+    
+    response = await llm.acomplete_with_images(prompt, images)
+    analysis_cache[key] = response
+    if len(analysis_cache) > ANALYSIS_CACHE_SIZE:
+        analysis_cache.popitem(last=False)
+    return response
+
+
+# Help screens and tips never change, so they are built once at import and
+# the same components are returned on every request
+VISION_ASSISTANT_HELP = Markdown("""
 # 👁️ Vision Assistant
 
 I can analyze and answer questions about images! Here's what I can do:
@@ -50,10 +160,31 @@ I can analyze and answer questions about images! Here's what I can do:
 - Multiple images at once
 
 Try me out with a screenshot, photo, or diagram!
-        """)
+""")
+
+# Use GPT-4 Vision by default (you can change to Claude 3 or Gemini)
+vision_assistant_llm = LLM(model="gpt-4-vision-preview", max_tokens=1000)
+
+
+@chatbot
+async def vision_assistant(message: str, images: list = None):
+    """
+    A general-purpose vision assistant that can analyze any image
+    
+    Features:
+    - Accepts images via URL or base64
+    - Provides detailed descriptions
+    - Answers questions about images
+    - Works with multiple images
+    """
+    if not images:
+        # No images provided - show instructions
+        yield VISION_ASSISTANT_HELP
         return
     
-    # Images provided - analyze them
+    # Images provided - analyze them (hashing large base64 payloads runs
+    # in a worker thread so it doesn't hold up other conversations)
+    images = await asyncio.to_thread(dedupe_images, images)
     num_images = len(images)
     
     if num_images == 1:
@@ -62,11 +193,38 @@ Try me out with a screenshot, photo, or diagram!
         yield Text(f"🔍 Analyzing {num_images} images...")
     
     # Use streaming for better UX
-    async for chunk in llm.stream_with_images(
+    async for text in coalesce_chunks(vision_assistant_llm.stream_with_images(
         message or "Please provide a detailed description of what you see in this image.",
         images
-    ):
-        yield Text(chunk)
+    )):
+        yield Text(text)
+
+
+SCREENSHOT_ANALYZER_HELP = [
+    Markdown("## 🖥️ Screenshot Analyzer"),
+    Text("Send me a screenshot of any app, website, or UI and I'll analyze it!"),
+    Text(""),
+    Text("I can:"),
+    Text("• Identify UI components and layouts"),
+    Text("• Explain the purpose of different elements"),
+    Text("• Suggest UI/UX improvements"),
+    Text("• Generate code to recreate the design"),
+    Text(""),
+    Text("💡 Tip: Ask me to 'generate React code' or 'create HTML/CSS' for the screenshot!")
+]
+
+SCREENSHOT_ANALYZER_TIPS = [
+    Text(""),
+    Text("Need something else? Try asking for:"),
+    Text("• 'Generate React code for this'"),
+    Text("• 'What could be improved in this UI?'"),
+    Text("• 'Explain the user flow'")
+]
+
+# Keyword rules for choosing what kind of output the user asked for
+SCREENSHOT_INTENTS = re.compile(r"(?P<code>code)|(?P<react>react)|(?P<markup>html|css)")
+
+screenshot_analyzer_llm = LLM(model="gpt-4-vision-preview", temperature=0.3)
 
 
 @chatbot(stream=False)
@@ -81,28 +239,16 @@ async def screenshot_analyzer(message: str, images: list = None):
     - Can generate code to recreate the UI
     """
     if not images:
-        return [
-            Markdown("## 🖥️ Screenshot Analyzer"),
-            Text("Send me a screenshot of any app, website, or UI and I'll analyze it!"),
-            Text(""),
-            Text("I can:"),
-            Text("• Identify UI components and layouts"),
-            Text("• Explain the purpose of different elements"),
-            Text("• Suggest UI/UX improvements"),
-            Text("• Generate code to recreate the design"),
-            Text(""),
-            Text("💡 Tip: Ask me to 'generate React code' or 'create HTML/CSS' for the screenshot!")
-        ]
-    
-    llm = LLM(model="gpt-4-vision-preview", temperature=0.3)
+        return SCREENSHOT_ANALYZER_HELP
     
     # Build appropriate prompt based on user message
+    intents = match_intents(SCREENSHOT_INTENTS, message) if message else set()
     if not message:
         prompt = "Analyze this screenshot. Identify the UI components, layout structure, and purpose of the interface."
-    elif "code" in message.lower():
-        if "react" in message.lower():
+    elif "code" in intents:
+        if "react" in intents:
             prompt = "Generate React component code that recreates this UI design. Include proper styling."
-        elif "html" in message.lower() or "css" in message.lower():
+        elif "markup" in intents:
             prompt = "Generate HTML and CSS code that recreates this UI design exactly."
         else:
             prompt = f"Generate code to recreate this UI. {message}"
@@ -110,32 +256,16 @@ async def screenshot_analyzer(message: str, images: list = None):
         prompt = message
     
     # Get complete analysis
-    response = await llm.acomplete_with_images(prompt, images)
+    response = await cached_analysis(screenshot_analyzer_llm, prompt, images)
     
     return [
         Markdown("## 🖥️ Screenshot Analysis"),
         Markdown(response),
-        Text(""),
-        Text("Need something else? Try asking for:"),
-        Text("• 'Generate React code for this'"),
-        Text("• 'What could be improved in this UI?'"),
-        Text("• 'Explain the user flow'")
+        *SCREENSHOT_ANALYZER_TIPS
     ]
 
 
-@chatbot
-async def document_reader(message: str, images: list = None):
-    """
-    OCR and document analysis bot
-    
-    Extracts and analyzes text from:
-    - Photos of documents
-    - Handwritten notes
-    - Forms and receipts
-    - Books and articles
-    """
-    if not images:
-        yield Markdown("""
+DOCUMENT_READER_HELP = Markdown("""
 ## 📄 Document Reader Bot
 
 I can read and analyze text from images! Send me:
@@ -153,32 +283,35 @@ I can read and analyze text from images! Send me:
 - Handwriting recognition
 
 Just upload an image containing text!
-        """)
-        return
+""")
+
+document_reader_llm = LLM(model="gpt-4-vision-preview", temperature=0.1)  # Low temp for accuracy
+
+
+@chatbot
+async def document_reader(message: str, images: list = None):
+    """
+    OCR and document analysis bot
     
-    llm = LLM(model="gpt-4-vision-preview", temperature=0.1)  # Low temp for accuracy
+    Extracts and analyzes text from:
+    - Photos of documents
+    - Handwritten notes
+    - Forms and receipts
+    - Books and articles
+    """
+    if not images:
+        yield DOCUMENT_READER_HELP
+        return
     
     prompt = message if message else "Please extract and transcribe all text from this image. If it's a form or structured document, preserve the structure."
     
     yield Text("📖 Reading document...")
     
-    async for chunk in llm.stream_with_images(prompt, images):
-        yield Text(chunk)
+    async for text in coalesce_chunks(document_reader_llm.stream_with_images(prompt, images)):
+        yield Text(text)
 
 
-@chatbot
-async def chart_interpreter(message: str, images: list = None):
-    """
-    Data visualization and chart analysis bot
-    
-    Interprets:
-    - Bar charts, line graphs, pie charts
-    - Technical diagrams
-    - Flowcharts and mind maps
-    - Scientific plots
-    """
-    if not images:
-        yield Markdown("""
+CHART_INTERPRETER_HELP = Markdown("""
 ## 📊 Chart & Diagram Interpreter
 
 I specialize in analyzing data visualizations and diagrams!
@@ -198,10 +331,25 @@ I specialize in analyzing data visualizations and diagrams!
 - Identify anomalies
 
 Upload a chart or diagram to get started!
-        """)
-        return
+""")
+
+chart_interpreter_llm = LLM(model="claude-3-sonnet-20240229", temperature=0.3)
+
+
+@chatbot
+async def chart_interpreter(message: str, images: list = None):
+    """
+    Data visualization and chart analysis bot
     
-    llm = LLM(model="claude-3-sonnet-20240229", temperature=0.3)
+    Interprets:
+    - Bar charts, line graphs, pie charts
+    - Technical diagrams
+    - Flowcharts and mind maps
+    - Scientific plots
+    """
+    if not images:
+        yield CHART_INTERPRETER_HELP
+        return
     
     if not message:
         prompt = "Analyze this chart/diagram. Explain what it shows, identify key trends or patterns, and provide insights about the data."
@@ -210,10 +358,27 @@ Upload a chart or diagram to get started!
     
     yield Text("📊 Analyzing visualization...")
     
-    response = await llm.acomplete_with_images(prompt, images)
+    response = await chart_interpreter_llm.acomplete_with_images(prompt, images)
     yield Markdown(response)
 
 
+MULTI_IMAGE_COMPARE_HELP = [
+    Markdown("## 🔄 Multi-Image Comparison Bot"),
+    Text("Send me 2 or more images and I'll compare them!"),
+    Text(""),
+    Text("Perfect for:"),
+    Text("• Before/after photos"),
+    Text("• Product comparisons"),
+    Text("• Design A/B testing"),
+    Text("• Progress documentation"),
+    Text("• Spot the differences"),
+    Text(""),
+    Text("Upload multiple images to start comparing!")
+]
+
+multi_image_compare_llm = LLM(model="gpt-4-vision-preview", temperature=0.5)
+
+
 @chatbot(stream=False)
 async def multi_image_compare(message: str, images: list = None):
     """
@@ -226,28 +391,16 @@ async def multi_image_compare(message: str, images: list = None):
     - Progress tracking
     """
     if not images:
-        return [
-            Markdown("## 🔄 Multi-Image Comparison Bot"),
-            Text("Send me 2 or more images and I'll compare them!"),
-            Text(""),
-            Text("Perfect for:"),
-            Text("• Before/after photos"),
-            Text("• Product comparisons"),
-            Text("• Design A/B testing"),
-            Text("• Progress documentation"),
-            Text("• Spot the differences"),
-            Text(""),
-            Text("Upload multiple images to start comparing!")
-        ]
+        return MULTI_IMAGE_COMPARE_HELP
     
-    if len(images) < 2:
-        return Text("Please upload at least 2 images for comparison!")
+    images = await asyncio.to_thread(dedupe_images, images)
     
-    llm = LLM(model="gpt-4-vision-preview", temperature=0.5)
+    if len(images) < 2:
+        return Text("Please upload at least 2 different images for comparison!")
     
     prompt = message if message else f"Compare these {len(images)} images. Identify similarities, differences, and any notable changes or patterns between them."
     
-    response = await llm.acomplete_with_images(prompt, images)
+    response = await multi_image_compare_llm.acomplete_with_images(prompt, images)
     
     return [
         Markdown(f"## 🔄 Comparison of {len(images)} Images"),
@@ -257,19 +410,7 @@ async def multi_image_compare(message: str, images: list = None):
     ]
 
 
-@chatbot
-async def creative_interpreter(message: str, images: list = None):
-    """
-    Creative and artistic interpretation of images
-    
-    Provides:
-    - Artistic analysis
-    - Creative descriptions
-    - Story generation from images
-    - Mood and emotion detection
-    """
-    if not images:
-        yield Markdown("""
+CREATIVE_INTERPRETER_HELP = Markdown("""
 ## 🎨 Creative Image Interpreter
 
 I provide artistic and creative interpretations of images!
@@ -288,39 +429,45 @@ I provide artistic and creative interpretations of images!
 - "Create a poem inspired by this"
 
 Upload an image to unlock its creative potential!
-        """)
-        return
+""")
+
+CREATIVE_INTENTS = re.compile(r"(?P<story>story)|(?P<poem>poem)")
+
+creative_interpreter_llm = LLM(model="claude-3-sonnet-20240229", temperature=0.9)  # High temp for creativity
+
+
+@chatbot
+async def creative_interpreter(message: str, images: list = None):
+    """
+    Creative and artistic interpretation of images
     
-    llm = LLM(model="claude-3-sonnet-20240229", temperature=0.9)  # High temp for creativity
+    Provides:
+    - Artistic analysis
+    - Creative descriptions
+    - Story generation from images
+    - Mood and emotion detection
+    """
+    if not images:
+        yield CREATIVE_INTERPRETER_HELP
+        return
     
+    intents = match_intents(CREATIVE_INTENTS, message) if message else set()
     if not message:
         prompt = "Provide a creative and artistic interpretation of this image. Describe its mood, emotions, and any stories it might tell."
-    elif "story" in message.lower():
+    elif "story" in intents:
         prompt = "Write a creative short story inspired by this image."
-    elif "poem" in message.lower():
+    elif "poem" in intents:
         prompt = "Create a poem inspired by this image."
     else:
         prompt = message
     
     yield Text("🎨 Creating artistic interpretation...")
     
-    async for chunk in llm.stream_with_images(prompt, images):
-        yield Text(chunk)
+    async for text in coalesce_chunks(creative_interpreter_llm.stream_with_images(prompt, images)):
+        yield Text(text)
 
 
-@chatbot
-async def accessibility_checker(message: str, images: list = None):
-    """
-    Checks images and UIs for accessibility issues
-    
-    Evaluates:
-    - Color contrast
-    - Text readability
-    - Alt text suggestions
-    - UI accessibility
-    """
-    if not images:
-        yield Markdown("""
+ACCESSIBILITY_CHECKER_HELP = Markdown("""
 ## ♿ Accessibility Checker
 
 I help ensure your images and UIs are accessible to everyone!
@@ -340,10 +487,25 @@ I help ensure your images and UIs are accessible to everyone!
 - Any visual content
 
 Upload an image to check its accessibility!
-        """)
-        return
+""")
+
+accessibility_checker_llm = LLM(model="gpt-4-vision-preview", temperature=0.3)
+
+
+@chatbot
+async def accessibility_checker(message: str, images: list = None):
+    """
+    Checks images and UIs for accessibility issues
     
-    llm = LLM(model="gpt-4-vision-preview", temperature=0.3)
+    Evaluates:
+    - Color contrast
+    - Text readability
+    - Alt text suggestions
+    - UI accessibility
+    """
+    if not images:
+        yield ACCESSIBILITY_CHECKER_HELP
+        return
     
     prompt = """Analyze this image for accessibility concerns. Check for:
 1. Color contrast issues
@@ -357,10 +519,13 @@ Upload an image to check its accessibility!
     
     yield Text("♿ Checking accessibility...")
     
-    response = await llm.acomplete_with_images(prompt, images)
+    response = await cached_analysis(accessibility_checker_llm, prompt, images)
     yield Markdown(response)
 
 
+base64_demo_llm = LLM(model="gpt-4-vision-preview")
+
+
 # Example showing base64 image handling
 @chatbot
 async def base64_demo(message: str, images: list = None):
@@ -385,8 +550,7 @@ async def base64_demo(message: str, images: list = None):
     yield Text("")
     yield Text("🤖 Now analyzing with AI...")
     
-    llm = LLM(model="gpt-4-vision-preview")
-    response = await llm.acomplete_with_images(
+    response = await base64_demo_llm.acomplete_with_images(
         message or "What's in this image?",
         images
     )